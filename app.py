@@ -2,8 +2,8 @@ import streamlit as st
 import pandas as pd
 
 # นำเข้าฟังก์ชันจากไฟล์โมดูลที่เราแยกไว้
-from data_processor import load_and_prep_data
-from ui_components import create_sidebar_filters, plot_trend_dual_axis, plot_demographics, plot_geographic
+from data_processor import load_and_prep_data, filter_patients
+from ui_components import inject_global_styles, create_sidebar_filters, plot_trend_dual_axis, plot_demographics, plot_geographic, render_data_quality
 from stats_analyzer import render_smart_insights # นำเข้าโมดูลสถิติใหม่
 
 def main():
@@ -11,50 +11,7 @@ def main():
     st.set_page_config(page_title="PM2.5 Health Surveillance", layout="wide")
     
     # --- Custom CSS เพื่อให้ UI ดูทันสมัยและฉลาดขึ้น ---
-    st.markdown("""
-        <style>
-        /* 1. นำเข้าฟอนต์ Sarabun */
-        @import url('https://fonts.googleapis.com/css2?family=Sarabun:wght@300;400;500;700&display=swap');
-        
-        /* 2. วิธีแก้แบบตรงจุด: 
-           - กำหนดฟอนต์ Sarabun ให้กับ Element ที่เป็นข้อความหลักทั้งหมด
-           - ใช้ Fallback เป็นฟอนต์ระบบมาตรฐาน เพื่อให้สัญลักษณ์ (Icons/Emojis) แสดงผลได้ปกติ
-        */
-        html, body, [data-testid="stAppViewContainer"], .stApp, p, h1, h2, h3, h4, h5, h6, label, li, span {
-            font-family: 'Sarabun', "Source Sans Pro", "Segoe UI", "Apple Color Emoji", "Segoe UI Emoji", sans-serif !important;
-        }
-
-        /* 3. วิธีแก้เฉพาะจุดสำหรับปุ่มย่อ-ขยาย Sidebar และ Header:
-           - บังคับให้ปุ่มควบคุม (Icons) กลับไปใช้ฟอนต์ดั้งเดิมของ Streamlit 100% 
-           - เพื่อป้องกันไม่ให้ Sarabun ไปทับรหัสสัญลักษณ์ของปุ่มเหล่านั้น
-        */
-        [data-testid="collapsedControl"] button, 
-        [data-testid="collapsedControl"] svg, 
-        [data-testid="stHeader"] svg,
-        button[kind="header"] {
-            font-family: "Source Sans Pro", sans-serif !important;
-        }
-
-        /* 4. ตกแต่งกล่อง Metric (คงเดิมตามความต้องการที่ไม่ให้แก้ส่วนไม่เกี่ยวข้อง) */
-        div[data-testid="metric-container"] {
-            background-color: #ffffff;
-            border: 1px solid #f0f2f6;
-            padding: 20px;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03);
-        }
-        div[data-testid="metric-container"] > div > div > div > div > p {
-            font-size: 1rem;
-            color: #64748b;
-            font-weight: 500;
-        }
-        div[data-testid="metric-container"] > div > div > div > div:nth-child(2) > p {
-            font-size: 2rem;
-            color: #0f172a;
-            font-weight: 700;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    inject_global_styles()
 
     # 2. ส่วนหัวของ Dashboard
     st.title("จำนวนผู้ป่วยด้วยโรคที่เกี่ยวข้องกับการสัมผัส PM2.5")
@@ -63,7 +20,11 @@ def main():
 
     # 3. โหลดข้อมูล
     with st.spinner('กำลังประมวลผลข้อมูลสาธารณสุข...'):
-        df_patients, df_pm25 = load_and_prep_data()
+        df_patients, df_pm25, quality_report = load_and_prep_data()
+
+    # 3.5 สรุปคุณภาพข้อมูล (แถวที่ถูกคัดออกและคำเตือน) แสดงก่อนตรวจข้อมูลว่าง
+    # เพื่อให้เห็นสาเหตุ กรณีที่ทุกแถวถูกคัดออก (เช่น รูปแบบวันที่ในชีตเปลี่ยน)
+    render_data_quality(quality_report)
 
     if df_patients.empty:
         st.warning("⚠️ ไม่สามารถดำเนินการต่อได้ กรุณาอัปโหลดหรือตรวจสอบไฟล์ข้อมูลต้นทาง")
@@ -73,23 +34,7 @@ def main():
     selected_year, selected_disease, walk_in_filter, selected_vulnerable = create_sidebar_filters(df_patients)
 
     # --- 5. การประยุกต์ใช้ตัวกรองข้อมูล ---
-    df_filtered = df_patients.copy()
-    
-    if selected_year:
-        df_filtered = df_filtered[df_filtered['Date'].dt.year.isin(selected_year)]
-    
-    if selected_disease:
-        df_filtered = df_filtered[df_filtered['4 กลุ่มโรคเฝ้าระวัง'].isin(selected_disease)]
-
-    if walk_in_filter == "เฉพาะ Walk-in (ไม่ได้นัด)":
-        df_filtered = df_filtered[df_filtered['Is_Walk_in'] == 'Walk-in (ไม่ได้นัด)']
-    elif walk_in_filter == "เฉพาะมาตามนัด":
-        df_filtered = df_filtered[df_filtered['Is_Walk_in'] == 'Appointment (นัดมา)']
-
-    # เพิ่มการกรองกลุ่มเปราะบางที่เลือกจาก Sidebar
-    if selected_vulnerable:
-        if 'กลุ่มเปราะบาง' in df_filtered.columns:
-            df_filtered = df_filtered[df_filtered['กลุ่มเปราะบาง'].isin(selected_vulnerable)]
+    df_filtered = filter_patients(df_patients, selected_year, selected_disease, walk_in_filter, selected_vulnerable)
 
     # --- 6. การแสดงผล KPI Cards ข้อมูลสรุป ---
     total_cases = len(df_filtered)
@@ -0,0 +1,84 @@
+"""
+จำลองผู้ใช้ N Session พร้อมกัน เพื่อวัดหน่วยความจำที่เพิ่มขึ้นต่อผู้ชมหนึ่งคน
+
+แต่ละ Session (Thread) เรียก load_and_prep_data() แล้วกรองข้อมูลด้วย filter_patients()
+เหมือนที่ app.main ทำ และถือ DataFrame ไว้จนจบการทดสอบ (เหมือนผู้ใช้ที่เปิดหน้าค้างไว้)
+
+วิธีใช้ (รันจากโฟลเดอร์หลักของโปรเจกต์ ต้องเชื่อมต่อ Google Sheets ได้):
+    python benchmarks/session_memory.py --sessions 50
+"""
+import argparse
+import os
+import sys
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processor import load_and_prep_data, filter_patients  # noqa: E402
+
+# ชุดตัวกรองที่ผู้ใช้แต่ละคนเลือก (หมุนเวียนตามลำดับ Session)
+FILTER_SCENARIOS = [
+    ("ค่าเริ่มต้น (ทุกปี ทุกโรค)", lambda years, diseases: (years, diseases, "ทั้งหมด", [])),
+    ("เฉพาะ Walk-in", lambda years, diseases: (years, diseases, "เฉพาะ Walk-in (ไม่ได้นัด)", [])),
+    ("ปีล่าสุด", lambda years, diseases: (years[-1:], diseases, "ทั้งหมด", [])),
+]
+
+def current_rss_mb():
+    """RSS ปัจจุบันของ Process (MB) อ่านจาก /proc บน Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        return float("nan")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="จำนวน Session ที่จำลอง")
+    args = parser.parse_args()
+
+    # โหลดครั้งแรก (Session แรกหลัง deploy) เป็น baseline
+    df_patients, df_pm25, _ = load_and_prep_data()
+    if df_patients.empty:
+        sys.exit("โหลดข้อมูลไม่สำเร็จ")
+
+    years = sorted(df_patients['Date'].dt.year.dropna().unique().astype(int))
+    diseases = list(df_patients['4 กลุ่มโรคเฝ้าระวัง'].dropna().unique())
+
+    tracemalloc.start()
+    rss_before = current_rss_mb()
+    alloc_before, _ = tracemalloc.get_traced_memory()
+
+    sessions = [None] * args.sessions
+
+    def run_session(i):
+        patients, pm25, _ = load_and_prep_data()
+        label, build = FILTER_SCENARIOS[i % len(FILTER_SCENARIOS)]
+        filtered = filter_patients(patients, *build(years, diseases))
+        sessions[i] = (label, patients, pm25, filtered)
+
+    threads = [threading.Thread(target=run_session, args=(i,)) for i in range(args.sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    alloc_after, _ = tracemalloc.get_traced_memory()
+    rss_after = current_rss_mb()
+    tracemalloc.stop()
+
+    shared = all(s[1] is df_patients and s[2] is df_pm25 for s in sessions)
+    base_mb = df_patients.memory_usage(deep=True).sum() / 1024 ** 2
+
+    print(f"ข้อมูลผู้ป่วย: {len(df_patients):,} แถว ({base_mb:.1f} MB)")
+    print(f"ทุก Session ใช้ DataFrame ชุดเดียวกัน: {shared}")
+    for label, _ in FILTER_SCENARIOS:
+        views = [s[3] for s in sessions if s[0] == label]
+        zero_copy = sum(v is df_patients for v in views)
+        print(f"  {label}: {len(views)} Session, ใช้ข้อมูลต้นฉบับโดยไม่คัดลอก {zero_copy} Session")
+    print(f"หน่วยความจำที่จัดสรรเพิ่ม (tracemalloc): {(alloc_after - alloc_before) / 1024 ** 2:.2f} MB "
+          f"= {(alloc_after - alloc_before) / 1024 / args.sessions:.1f} KB ต่อ Session")
+    print(f"RSS: {rss_before:.1f} -> {rss_after:.1f} MB ({args.sessions} Session)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+วัดเวลาเริ่มต้นแอป (Cold Start) แยกตามส่วนประกอบ
+
+- เวลา import ของแต่ละโมดูล (รวมโมดูลที่พึ่งพา) วัดใน Python Process ใหม่ทุกครั้ง (เหมือนหลัง deploy/restart container)
+- ตรวจว่าหลัง import app แล้ว plotly.express ถูกโหลดหรือยัง
+- --with-data: เวลาโหลดและเตรียมข้อมูลจาก Google Sheets (load_and_prep_data ครั้งแรก)
+- --with-app: เวลารันสคริปต์ app.py ครบหนึ่งรอบฝั่งเซิร์ฟเวอร์ด้วย streamlit.testing (ใกล้เคียงเวลา First Paint)
+
+วิธีใช้ (รันจากโฟลเดอร์หลักของโปรเจกต์):
+    python benchmarks/startup.py --repeat 5 --with-data --with-app
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# แต่ละรายการวัดแยกกันใน Process ใหม่ ลำดับสะท้อนสิ่งที่ app.py โหลดจริง
+IMPORT_TARGETS = [
+    "pandas",
+    "streamlit",
+    "plotly.express",
+    "data_processor",
+    "stats_analyzer",
+    "ui_components",
+    "app",
+]
+
+def _run_fresh(code):
+    """รันโค้ดใน Python Process ใหม่ แล้วคืนค่าที่พิมพ์ออกมาบรรทัดสุดท้าย"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+def time_import(module, repeat):
+    """เวลา import (วินาที) ของโมดูลใน Process ใหม่ คืนค่า median จากหลายรอบ"""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    return statistics.median(float(_run_fresh(code)) for _ in range(repeat))
+
+def loaded_after_app_import():
+    """ตรวจว่าโมดูล Plotly ใดถูกโหลดแล้วหลัง import app"""
+    code = (
+        "import sys, app; "
+        "print(','.join(m for m in ('plotly', 'plotly.graph_objects', 'plotly.express') if m in sys.modules))"
+    )
+    return _run_fresh(code)
+
+def time_data_load():
+    """เวลาโหลดข้อมูลครั้งแรก (ดึงจาก Google Sheets + เตรียมข้อมูล + ตรวจสอบคุณภาพ)"""
+    code = (
+        "import time, data_processor; t = time.perf_counter(); "
+        "data_processor.load_and_prep_data(); print(time.perf_counter() - t)"
+    )
+    return float(_run_fresh(code))
+
+def time_app_run():
+    """เวลารัน app.py ครบหนึ่งรอบ (รวม import, โหลดข้อมูล และสร้างทุกองค์ประกอบ)"""
+    code = (
+        "import time; t = time.perf_counter(); "
+        "from streamlit.testing.v1 import AppTest; "
+        "AppTest.from_file('app.py', default_timeout=120).run(); print(time.perf_counter() - t)"
+    )
+    return float(_run_fresh(code))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="จำนวนรอบต่อการวัด import")
+    parser.add_argument("--with-data", action="store_true", help="วัดเวลาโหลดข้อมูลด้วย (ต้องใช้เครือข่าย)")
+    parser.add_argument("--with-app", action="store_true", help="วัดเวลารัน app.py หนึ่งรอบ (ต้องใช้เครือข่าย)")
+    args = parser.parse_args()
+
+    print(f"Python {sys.version.split()[0]}, median จาก {args.repeat} รอบ (Process ใหม่ทุกรอบ)")
+    for module in IMPORT_TARGETS:
+        print(f"  import {module:<16} {time_import(module, args.repeat):6.3f} s")
+    print(f"โมดูล Plotly ที่ถูกโหลดหลัง import app: {loaded_after_app_import() or '-'}")
+
+    if args.with_data:
+        print(f"load_and_prep_data ครั้งแรก: {time_data_load():6.3f} s")
+    if args.with_app:
+        print(f"รัน app.py หนึ่งรอบ (AppTest):  {time_app_run():6.3f} s")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,30 @@
 import pandas as pd
 import streamlit as st
 
-@st.cache_data(ttl=3600) # เพิ่ม ttl=3600 เพื่อให้ดึงข้อมูลใหม่ทุกๆ 1 ชั่วโมง
+from data_validator import (
+    PATIENT_SCHEMA, PM25_SCHEMA, snapshot_fingerprint, find_missing_columns, validate_patients, validate_pm25
+)
+
+# เปิด Copy-on-Write เพื่อให้การเลือกคอลัมน์/กรองข้อมูลจาก DataFrame ที่แชร์ร่วมกัน
+# ไม่คัดลอกข้อมูลจนกว่าจะมีการแก้ไขจริง และการแก้ไขจะไม่ย้อนกลับไปกระทบต้นฉบับ
+# (pandas 3.x เปิด Copy-on-Write เป็นค่าเริ่มต้นแล้ว และตัวเลือกนี้ถูกยกเลิก จึงตั้งค่าเฉพาะเวอร์ชันก่อนหน้า)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+@st.cache_resource
+def _snapshot_registry():
+    """ที่เก็บผลลัพธ์ล่าสุดตาม fingerprint ของข้อมูลดิบ (ใช้ร่วมกันทั้ง Process)"""
+    return {}
+
+@st.cache_resource(ttl=3600) # เพิ่ม ttl=3600 เพื่อให้ดึงข้อมูลใหม่ทุกๆ 1 ชั่วโมง
 def load_and_prep_data():
     """
     ฟังก์ชันสำหรับโหลดข้อมูลจาก Google Sheets และทำความสะอาดข้อมูลให้อยู่ในรูปแบบที่พร้อมใช้งาน
+
+    ใช้ st.cache_resource แทน st.cache_data เพื่อให้ทุก Session ใช้ DataFrame ชุดเดียวกันในหน่วยความจำ
+    (ไม่คัดลอกใหม่ต่อผู้ใช้) ดังนั้นผู้เรียกใช้ต้องถือว่าข้อมูลที่ได้เป็นแบบอ่านอย่างเดียว ห้ามแก้ไขแบบ inplace
+
+    คืนค่า (df_patients, df_pm25, quality_report) โดย quality_report มีสรุปคุณภาพข้อมูลและตารางแถวที่ถูกคัดออก
     """
     # แปลง URL ของ Google Sheets ให้อยู่ในรูปแบบ Export เป็น CSV
     url_patients = "https://docs.google.com/spreadsheets/d/1vvQ8YLChHXvCowQQzcKIeV4PWt0CCt76f5Sj3fNTOV0/export?format=csv&gid=795124395"
@@ -17,19 +37,41 @@ def load_and_prep_data():
     except Exception as e:
         # ถ้าโหลดไม่ได้ ให้แสดง Error แจ้งเตือนผู้ใช้
         st.error(f"ไม่สามารถดึงข้อมูลจาก Google Sheets ได้ กรุณาตรวจสอบการตั้งค่าการแชร์ (ต้องเป็น 'Anyone with the link')\n\nข้อผิดพลาด: {e}")
-        return pd.DataFrame(), pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame(), {}
+
+    # ตรวจสอบคอลัมน์ที่จำเป็นก่อนประมวลผล เพื่อไม่ให้ไปเกิด KeyError ภายหลังใน app/ui_components
+    missing_patients = find_missing_columns(df_patients, PATIENT_SCHEMA)
+    if missing_patients:
+        st.error(f"{PATIENT_SCHEMA['name']}ขาดคอลัมน์ที่จำเป็น: {', '.join(missing_patients)}")
+        return pd.DataFrame(), pd.DataFrame(), {}
+
+    missing_pm25 = find_missing_columns(df_pm25, PM25_SCHEMA)
+    if missing_pm25:
+        # ยังแสดงข้อมูลผู้ป่วยได้ แต่ไม่มีข้อมูลฝุ่นสำหรับเปรียบเทียบ
+        st.error(f"{PM25_SCHEMA['name']}ขาดคอลัมน์ที่จำเป็น: {', '.join(missing_pm25)}")
+        df_pm25 = pd.DataFrame(columns=PM25_SCHEMA['required_columns'])
+
+    # ถ้าข้อมูลดิบเหมือนรอบก่อน (เช่น ครบ ttl แต่ชีตไม่มีการแก้ไข) ใช้ผลลัพธ์เดิมโดยไม่ต้องประมวลผล/ตรวจสอบซ้ำ
+    registry = _snapshot_registry()
+    fingerprint = (snapshot_fingerprint(df_patients), snapshot_fingerprint(df_pm25))
+    if registry.get('fingerprint') == fingerprint:
+        return registry['result']
+
+    # หาแถวที่ซ้ำกันทุกคอลัมน์จากข้อมูลดิบ ก่อนที่ขั้นทำความสะอาดจะแก้ไขค่าในคอลัมน์
+    raw_duplicates = df_patients.duplicated(keep='first').to_numpy()
 
     # --- การทำความสะอาดข้อมูลผู้ป่วย (df_patients) ---
     
-    # ก. แปลงวันที่ (ปี พ.ศ. เป็น ค.ศ.)
-    def convert_thai_date(date_str):
-        try:
-            d, m, y = str(date_str).split('/')
-            return pd.to_datetime(f"{int(y)-543}-{m}-{d}")
-        except:
-            return pd.NaT
-            
-    df_patients['Date'] = df_patients['วันที่มารับบริการ'].apply(convert_thai_date)
+    # ก. แปลงวันที่ (ปี พ.ศ. เป็น ค.ศ.) แบบ vectorized รูปแบบ "วัน/เดือน/ปี พ.ศ." แถวที่ผิดรูปแบบจะเป็น NaT
+    date_parts = df_patients['วันที่มารับบริการ'].astype(str).str.extract(r'^\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*$')
+    df_patients['Date'] = pd.to_datetime(
+        pd.DataFrame({
+            'year': pd.to_numeric(date_parts[2]) - 543,
+            'month': pd.to_numeric(date_parts[1]),
+            'day': pd.to_numeric(date_parts[0]),
+        }),
+        errors='coerce'
+    )
     df_patients['Month_Year'] = df_patients['Date'].dt.to_period('M')
 
     # ข. จัดการคอลัมน์ "ผู้ป่วยนัด"
@@ -69,18 +111,62 @@ def load_and_prep_data():
     thai_months = {'ม.ค.':'01', 'ก.พ.':'02', 'มี.ค.':'03', 'เม.ย.':'04', 'พ.ค.':'05', 'มิ.ย.':'06',
                    'ก.ค.':'07', 'ส.ค.':'08', 'ก.ย.':'09', 'ต.ค.':'10', 'พ.ย.':'11', 'ธ.ค.':'12'}
                    
-    def parse_pm25_date(date_str):
-        try:
-            m_thai, y = str(date_str).split()
-            m_num = thai_months.get(m_thai, '01')
-            return pd.to_datetime(f"{y}-{m_num}-01").to_period('M')
-        except:
-            return pd.NaT
-
-    df_pm25['Month_Year'] = df_pm25['Date'].apply(parse_pm25_date)
+    # แปลงแบบ vectorized ชื่อเดือนที่ไม่รู้จักหรือรูปแบบผิดจะเป็น NaT (ถูกคัดออกในขั้นตรวจสอบคุณภาพ)
+    month_parts = df_pm25['Date'].astype(str).str.extract(r'^\s*(\S+)\s+(\d{4})\s*$')
+    df_pm25['Month_Year'] = pd.to_datetime(
+        pd.DataFrame({
+            'year': pd.to_numeric(month_parts[1]),
+            'month': pd.to_numeric(month_parts[0].map(thai_months)),
+            'day': 1,
+        }),
+        errors='coerce'
+    ).dt.to_period('M')
     
     # ลบช่องว่างในชื่อคอลัมน์และเปลี่ยนชื่อเพื่อความง่ายในการอ้างอิง
     if 'PM2.5 (ug/m3)' in df_pm25.columns:
         df_pm25.rename(columns={'PM2.5 (ug/m3)': 'PM25'}, inplace=True)
+    df_pm25['PM25'] = pd.to_numeric(df_pm25['PM25'], errors='coerce')
+
+    # --- ตรวจสอบคุณภาพข้อมูล และแยกแถวที่ไม่ผ่านไปไว้ในตารางกักกัน ---
+    df_patients, quarantine_patients, summary_patients = validate_patients(df_patients, raw_duplicates)
+    df_pm25, quarantine_pm25, summary_pm25 = validate_pm25(df_pm25)
+
+    quality_report = {
+        'summaries': [summary_patients, summary_pm25],
+        'quarantine': {
+            PATIENT_SCHEMA['name']: quarantine_patients,
+            PM25_SCHEMA['name']: quarantine_pm25,
+        },
+    }
+
+    result = (df_patients, df_pm25, quality_report)
+    registry['fingerprint'] = fingerprint
+    registry['result'] = result
+    return result
+
+def filter_patients(df_patients, selected_year, selected_disease, walk_in_filter, selected_vulnerable):
+    """
+    กรองข้อมูลผู้ป่วยตามตัวกรองจาก Sidebar
+    df_patients เป็นข้อมูลที่แชร์ร่วมกันทุก Session (ห้ามแก้ไข) จึงรวมเงื่อนไขทั้งหมดเป็น mask เดียว
+    แล้วตัดข้อมูลเพียงครั้งเดียว แทนการ copy() และกรองซ้ำทีละขั้น
+    """
+    mask = pd.Series(True, index=df_patients.index)
+    
+    if selected_year:
+        mask &= df_patients['Date'].dt.year.isin(selected_year)
+    
+    if selected_disease:
+        mask &= df_patients['4 กลุ่มโรคเฝ้าระวัง'].isin(selected_disease)
+
+    if walk_in_filter == "เฉพาะ Walk-in (ไม่ได้นัด)":
+        mask &= df_patients['Is_Walk_in'] == 'Walk-in (ไม่ได้นัด)'
+    elif walk_in_filter == "เฉพาะมาตามนัด":
+        mask &= df_patients['Is_Walk_in'] == 'Appointment (นัดมา)'
+
+    # เพิ่มการกรองกลุ่มเปราะบางที่เลือกจาก Sidebar
+    if selected_vulnerable:
+        if 'กลุ่มเปราะบาง' in df_patients.columns:
+            mask &= df_patients['กลุ่มเปราะบาง'].isin(selected_vulnerable)
 
-    return df_patients, df_pm25
+    # ถ้าไม่มีแถวใดถูกตัดออก ใช้ข้อมูลที่แชร์อยู่ได้เลยโดยไม่ต้องคัดลอก
+    return df_patients if mask.all() else df_patients[mask]
@@ -0,0 +1,139 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# --- Schema ของข้อมูลแต่ละตาราง (ประกาศไว้ที่เดียว แก้ไขเกณฑ์ได้โดยไม่ต้องแตะโค้ดตรวจสอบ) ---
+PATIENT_SCHEMA = {
+    "name": "ข้อมูลผู้ป่วย",
+    # คอลัมน์ที่ data_processor / app / ui_components อ้างอิงโดยตรง
+    "required_columns": ['วันที่มารับบริการ', 'ผู้ป่วยนัด', 'COPD+Asthma at OPD', '4 กลุ่มโรคเฝ้าระวัง'],
+    "date_column": 'Date',
+    "max_date_failure_rate": 0.05,       # วันที่แปลงไม่ได้เกิน 5% ให้แจ้งเตือน
+    "age_group_column": 'กลุ่มเปราะบาง',
+    "invalid_age_label": 'ข้อมูลอายุไม่ถูกต้อง',
+    "max_invalid_age_rate": 0.10,        # ข้อมูลอายุไม่ถูกต้องเกิน 10% ให้แจ้งเตือน
+    "publish_quarantine_rows": False,    # ข้อมูลรายบุคคล: แสดงบน Dashboard เฉพาะจำนวนตามเหตุผล
+}
+
+PM25_SCHEMA = {
+    "name": "ข้อมูล PM2.5",
+    "required_columns": ['Date', 'PM2.5 (ug/m3)'],
+    "raw_date_column": 'Date',
+    "date_column": 'Month_Year',
+    "value_column": 'PM25',
+    "value_range": (0, 1000),            # ค่าเฉลี่ยรายเดือนที่เป็นไปได้ (µg/m³)
+    "max_quarantine_rate": 0.05,         # แถวที่ถูกคัดออกเกิน 5% ให้แจ้งเตือน (ไม่นับแถวว่าง)
+    "publish_quarantine_rows": True,     # ข้อมูลรายเดือนระดับพื้นที่ ไม่มีข้อมูลส่วนบุคคล
+}
+
+QUARANTINE_REASON_COLUMN = 'เหตุผลที่คัดออก'
+
+def snapshot_fingerprint(df):
+    """สร้างลายนิ้วมือ (hash) ของข้อมูลดิบ เพื่อตรวจว่าข้อมูลชุดใหม่เหมือนชุดเดิมหรือไม่"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+def find_missing_columns(df, schema):
+    """คืนรายชื่อคอลัมน์ที่จำเป็นแต่ไม่พบในข้อมูล"""
+    return [col for col in schema["required_columns"] if col not in df.columns]
+
+def _split_quarantine(df, conditions, reasons):
+    """
+    แยกแถวที่ไม่ผ่านการตรวจสอบออกไปเป็นตารางกักกัน (Quarantine)
+    conditions/reasons เรียงตามลำดับความสำคัญ แถวที่ผิดหลายข้อจะถูกบันทึกด้วยเหตุผลแรกที่พบ
+    """
+    bad = np.logical_or.reduce(conditions)
+    quarantine = df[bad].copy()
+    quarantine[QUARANTINE_REASON_COLUMN] = np.select([c[bad] for c in conditions], reasons, default='')
+    return df[~bad], quarantine
+
+def validate_patients(df, raw_duplicates, schema=PATIENT_SCHEMA):
+    """
+    ตรวจสอบคุณภาพข้อมูลผู้ป่วยแบบ vectorized (ทำงานหลังแปลงวันที่แล้ว)
+    raw_duplicates คือ mask แถวที่ซ้ำทุกคอลัมน์ของข้อมูลดิบ (ก่อนทำความสะอาด)
+    คืนค่า (ข้อมูลที่ผ่าน, ตารางกักกัน, สรุปคุณภาพข้อมูล)
+    """
+    total = len(df)
+    bad_date = df[schema["date_column"]].isna().to_numpy()
+    # ชีตผู้ป่วยไม่มีรหัสการมารับบริการ/HN ผู้ป่วยต่างคนที่ข้อมูลตรงกันทุกคอลัมน์จึงเกิดขึ้นได้จริง
+    # แถวซ้ำจึงรายงานในสรุปเท่านั้น ไม่คัดออก
+    duplicated = np.asarray(raw_duplicates, dtype=bool)
+
+    invalid_age_rate = np.nan
+    if schema["age_group_column"] in df.columns and total > 0:
+        invalid_age_rate = (df[schema["age_group_column"]] == schema["invalid_age_label"]).mean()
+
+    clean, quarantine = _split_quarantine(
+        df, [bad_date], ['วันที่มารับบริการไม่ถูกต้อง']
+    )
+
+    date_failure_rate = bad_date.mean() if total > 0 else 0.0
+    warnings = []
+    if date_failure_rate > schema["max_date_failure_rate"]:
+        warnings.append(f"แปลงวันที่มารับบริการไม่ได้ {date_failure_rate:.1%} ของแถวทั้งหมด")
+    if not pd.isna(invalid_age_rate) and invalid_age_rate > schema["max_invalid_age_rate"]:
+        warnings.append(f"พบ '{schema['invalid_age_label']}' {invalid_age_rate:.1%} ของแถวทั้งหมด")
+
+    summary = {
+        "name": schema["name"],
+        "total_rows": total,
+        "clean_rows": len(clean),
+        "date_failures": int(bad_date.sum()),
+        "date_failure_rate": date_failure_rate,
+        "duplicates": int(duplicated.sum()),
+        "duplicates_removed": False,
+        "invalid_age_rate": invalid_age_rate,
+        "publish_quarantine_rows": schema["publish_quarantine_rows"],
+        "warnings": warnings,
+    }
+    return clean, quarantine, summary
+
+def validate_pm25(df, schema=PM25_SCHEMA):
+    """
+    ตรวจสอบคุณภาพข้อมูล PM2.5 แบบ vectorized (ทำงานหลังแปลงเดือนและเปลี่ยนชื่อคอลัมน์แล้ว)
+    แถวว่างทั้งแถว (ไม่มีทั้งเดือนและค่า เช่น แถวเว้นระยะในชีต) ถูกตัดทิ้งก่อนตรวจ ไม่นับเป็นข้อผิดพลาด
+    คืนค่า (ข้อมูลที่ผ่าน, ตารางกักกัน, สรุปคุณภาพข้อมูล)
+    """
+    blank = df[schema["raw_date_column"]].isna() & df[schema["value_column"]].isna()
+    blank_rows = int(blank.sum())
+    df = df[~blank]
+
+    total = len(df)
+    low, high = schema["value_range"]
+    values = df[schema["value_column"]]
+
+    bad_date = df[schema["date_column"]].isna().to_numpy()
+    missing_value = values.isna().to_numpy()
+    out_of_range = ((values < low) | (values > high)).to_numpy()
+    # เดือนเดียวกันควรมีค่าเพียงแถวเดียว: นับซ้ำเฉพาะแถวที่ผ่านการตรวจอื่นแล้ว (เก็บแถวแรกที่ถูกต้องไว้)
+    valid = ~(bad_date | missing_value | out_of_range)
+    duplicated = df[schema["date_column"]].where(valid).duplicated(keep='first').to_numpy() & valid
+
+    clean, quarantine = _split_quarantine(
+        df,
+        [bad_date, missing_value, out_of_range, duplicated],
+        ['เดือนไม่ถูกต้อง', 'ไม่มีค่า PM2.5', f'ค่า PM2.5 อยู่นอกช่วง {low}-{high}', 'เดือนซ้ำ'],
+    )
+
+    quarantine_rate = len(quarantine) / total if total > 0 else 0.0
+    warnings = []
+    if quarantine_rate > schema["max_quarantine_rate"]:
+        warnings.append(f"คัดข้อมูล PM2.5 ออก {len(quarantine):,} แถว ({quarantine_rate:.1%})")
+
+    summary = {
+        "name": schema["name"],
+        "total_rows": total,
+        "blank_rows": blank_rows,
+        "clean_rows": len(clean),
+        "date_failures": int(bad_date.sum()),
+        "date_failure_rate": bad_date.mean() if total > 0 else 0.0,
+        "missing_values": int(missing_value.sum()),
+        "out_of_range": int(out_of_range.sum()),
+        "duplicates": int(duplicated.sum()),
+        "duplicates_removed": True,
+        "publish_quarantine_rows": schema["publish_quarantine_rows"],
+        "warnings": warnings,
+    }
+    return clean, quarantine, summary
@@ -0,0 +1,29 @@
+"""
+ดาวน์โหลดฟอนต์ Sarabun (SIL Open Font License) จากคลัง google/fonts มาไว้ที่ static/fonts
+เพื่อให้แอปเสิร์ฟฟอนต์จากเครื่องเอง แทนการ @import จาก Google Fonts ทุกครั้งที่เปิดหน้า
+
+วิธีใช้ (รันครั้งเดียวจากโฟลเดอร์หลักของโปรเจกต์ แล้ว commit ไฟล์ใน static/fonts):
+    python scripts/fetch_fonts.py
+"""
+import os
+import sys
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ui_components import FONT_DIR, SARABUN_WEIGHTS  # noqa: E402
+
+SOURCE_URL = "https://raw.githubusercontent.com/google/fonts/main/ofl/sarabun/{name}"
+
+def main():
+    FONT_DIR.mkdir(parents=True, exist_ok=True)
+    # ไฟล์สัญญาอนุญาต OFL ต้องแนบไปพร้อมฟอนต์
+    names = [f"Sarabun-{weight}.ttf" for weight in SARABUN_WEIGHTS.values()] + ["OFL.txt"]
+    for name in names:
+        target = FONT_DIR / name
+        urllib.request.urlretrieve(SOURCE_URL.format(name=name), target)
+        print(f"{target.relative_to(ROOT)} ({target.stat().st_size / 1024:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -18,31 +18,127 @@ def get_correlation_insight(corr):
     else:
         return "เชิงลบ", "#3b82f6", "📉", "ข้อมูลแปรผกผัน (อาจเกิดจากปัจจัยอื่น)"
 
+# จำนวนรอบการสุ่มสำหรับ Bootstrap / Permutation Test (สุ่มพร้อมกันทั้งหมดเป็นอาร์เรย์เดียว)
+N_RESAMPLES = 2000
+
+def _rowwise_corr(xs, ys):
+    """คำนวณ Pearson r ของทุกแถวในเมทริกซ์พร้อมกัน (แต่ละแถวคือชุดข้อมูลที่สุ่มได้ 1 รอบ)"""
+    xc = xs - xs.mean(axis=1, keepdims=True)
+    yc = ys - ys.mean(axis=1, keepdims=True)
+    denom = np.sqrt((xc ** 2).sum(axis=1) * (yc ** 2).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (xc * yc).sum(axis=1) / denom
+
+def _pct_change(avg_high, avg_low):
+    """ร้อยละการเปลี่ยนแปลงแบบ vectorized (คืนค่า NaN เมื่อค่าเฉลี่ยเดือนปกติเป็น 0 เพราะหาอัตราส่วนไม่ได้)"""
+    avg_high = np.asarray(avg_high, dtype=float)
+    avg_low = np.asarray(avg_low, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(avg_low > 0, (avg_high - avg_low) / avg_low * 100, np.nan)
+
+@st.cache_data(show_spinner=False)
+def bootstrap_correlation(x, y, n_resamples=N_RESAMPLES, seed=42):
+    """
+    หาช่วงความเชื่อมั่น 95% ของ Pearson r ด้วย Bootstrap และ p-value ด้วย Permutation Test
+    สุ่มข้อมูลทุกรอบพร้อมกันเป็นอาร์เรย์ NumPy ก้อนเดียว และ cache ตามข้อมูลรายเดือนที่ส่งเข้ามา (ตามตัวกรองที่เลือก)
+    คืนค่า (ci_low, ci_high, p_value)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 3:
+        return np.nan, np.nan, np.nan
+
+    r_obs = _rowwise_corr(x[np.newaxis, :], y[np.newaxis, :])[0]
+    if np.isnan(r_obs):
+        return np.nan, np.nan, np.nan
+
+    rng = np.random.default_rng(seed)
+
+    # Bootstrap: สุ่มเดือนแบบใส่คืน (จับคู่ x, y ไปด้วยกัน)
+    idx = rng.integers(0, n, size=(n_resamples, n))
+    boot_r = _rowwise_corr(x[idx], y[idx])
+    ci_low, ci_high = np.nanpercentile(boot_r, [2.5, 97.5])
+
+    # Permutation: สลับลำดับ y เพื่อจำลองกรณีไม่มีความสัมพันธ์ (ทดสอบสองทาง)
+    perm = rng.permuted(np.tile(np.arange(n), (n_resamples, 1)), axis=1)
+    perm_r = _rowwise_corr(np.broadcast_to(x, (n_resamples, n)), y[perm])
+    p_value = (np.sum(np.abs(perm_r) >= abs(r_obs) - 1e-12) + 1) / (n_resamples + 1)
+
+    return ci_low, ci_high, p_value
+
+@st.cache_data(show_spinner=False)
+def bootstrap_vulnerable_change(high_counts, low_counts, n_resamples=N_RESAMPLES, seed=42):
+    """
+    หาช่วงความเชื่อมั่น 95% ของร้อยละการเปลี่ยนแปลง (เดือนฝุ่นสูง vs ฝุ่นปกติ) ด้วย Bootstrap
+    และ p-value ด้วย Permutation Test โดยสลับป้ายเดือนฝุ่นสูง/ต่ำ คืนค่า (ci_low, ci_high, p_value)
+    """
+    high = np.asarray(high_counts, dtype=float)
+    low = np.asarray(low_counts, dtype=float)
+    n_high, n_low = len(high), len(low)
+    if n_high < 2 or n_low < 2:
+        return np.nan, np.nan, np.nan
+
+    rng = np.random.default_rng(seed)
+
+    # Bootstrap: สุ่มเดือนแบบใส่คืนแยกในแต่ละกลุ่ม
+    boot_high = high[rng.integers(0, n_high, size=(n_resamples, n_high))].mean(axis=1)
+    boot_low = low[rng.integers(0, n_low, size=(n_resamples, n_low))].mean(axis=1)
+    # รอบที่ค่าเฉลี่ยเดือนปกติเป็น 0 หาร้อยละไม่ได้ (_pct_change คืน NaN) จึงไม่ถูกนับในช่วงความเชื่อมั่น
+    boot_pct = _pct_change(boot_high, boot_low)
+    if np.isnan(boot_pct).all():
+        ci_low, ci_high = np.nan, np.nan
+    else:
+        ci_low, ci_high = np.nanpercentile(boot_pct, [2.5, 97.5])
+
+    # Permutation: ใช้ผลต่างค่าเฉลี่ยเป็นตัวสถิติ (ทดสอบสองทาง)
+    pooled = np.concatenate([high, low])
+    perm = rng.permuted(np.tile(np.arange(n_high + n_low), (n_resamples, 1)), axis=1)
+    shuffled = pooled[perm]
+    perm_diff = shuffled[:, :n_high].mean(axis=1) - shuffled[:, n_high:].mean(axis=1)
+    obs_diff = high.mean() - low.mean()
+    p_value = (np.sum(np.abs(perm_diff) >= abs(obs_diff) - 1e-12) + 1) / (n_resamples + 1)
+
+    return ci_low, ci_high, p_value
+
+def format_uncertainty(ci_low, ci_high, p_value, value_format="{:.2f}"):
+    """แปลงผล Bootstrap/Permutation ให้เป็นข้อความสั้นๆ สำหรับแสดงบนการ์ด"""
+    if pd.isna(ci_low) or pd.isna(ci_high) or pd.isna(p_value):
+        return "ข้อมูลไม่พอสำหรับคำนวณช่วงความเชื่อมั่น"
+    p_text = "p<0.001" if p_value < 0.001 else f"p={p_value:.3f}"
+    return f"95% CI [{value_format.format(ci_low)}, {value_format.format(ci_high)}] · {p_text}"
+
 def analyze_disease_correlation(df, df_pm25):
-    """คำนวณความสัมพันธ์แยกตามกลุ่มโรค และหาโรคที่สัมพันธ์สูงสุด"""
+    """
+    คำนวณความสัมพันธ์แยกตามกลุ่มโรค และหาโรคที่สัมพันธ์สูงสุด
+    คืนค่า (โรคที่ r สูงสุด, r สูงสุด, dict ของทุกโรค -> (r, ci_low, ci_high, p_value))
+    """
     monthly_disease = df.groupby(['Month_Year', '4 กลุ่มโรคเฝ้าระวัง']).size().reset_index(name='Count')
     merged = pd.merge(monthly_disease, df_pm25, on='Month_Year', how='inner')
     
     disease_corrs = {}
+    disease_stats = {}
     for disease in merged['4 กลุ่มโรคเฝ้าระวัง'].unique():
         sub = merged[merged['4 กลุ่มโรคเฝ้าระวัง'] == disease]
         if len(sub) > 2: # ต้องมีข้อมูลอย่างน้อย 3 เดือนถึงจะหา correlation ได้
             r = sub['Count'].corr(sub['PM25'])
             if not pd.isna(r):
                 disease_corrs[disease] = r
+                disease_stats[disease] = (r, *bootstrap_correlation(sub['Count'].to_numpy(), sub['PM25'].to_numpy()))
                 
     if not disease_corrs:
-        return None, None
+        return None, None, {}
         
     # หาโรคที่มีค่า r สูงสุด
     top_disease = max(disease_corrs, key=disease_corrs.get)
     max_corr = disease_corrs[top_disease]
-    return top_disease, max_corr
+    return top_disease, max_corr, disease_stats
 
 def analyze_vulnerable_impact(df, df_pm25):
     """
     วิเคราะห์ผลกระทบต่อกลุ่มเปราะบาง 
     โดยเทียบเดือนที่ฝุ่นเกินมาตรฐาน (> 37.5) vs เดือนที่ฝุ่นปกติ
+    คืนค่า (ร้อยละที่เพิ่มขึ้น, ค่าเฉลี่ยเดือนฝุ่นสูง, ค่าเฉลี่ยเดือนฝุ่นปกติ, (ci_low, ci_high, p_value))
     """
     # เกณฑ์มาตรฐาน PM2.5 ของไทย (ค่าเฉลี่ย 24 ชม. ปรับใช้กับรายเดือนเพื่อเป็น Threshold เบื้องต้น)
     THRESHOLD = 37.5 
@@ -56,9 +152,12 @@ def analyze_vulnerable_impact(df, df_pm25):
         
     vul_data = df[df['กลุ่มเปราะบาง'].isin(focus_groups)]
     
-    # นับจำนวนผู้ป่วยในเดือนที่ฝุ่นสูง vs ต่ำ
-    high_cases = vul_data[vul_data['Month_Year'].isin(df_pm25_high)].shape[0]
-    low_cases = vul_data[vul_data['Month_Year'].isin(df_pm25_low)].shape[0]
+    # นับจำนวนผู้ป่วยรายเดือนในเดือนที่ฝุ่นสูง vs ต่ำ (เดือนที่ไม่มีผู้ป่วยนับเป็น 0)
+    monthly_vul = vul_data.groupby('Month_Year').size()
+    high_counts = monthly_vul.reindex(df_pm25_high).fillna(0).to_numpy()
+    low_counts = monthly_vul.reindex(df_pm25_low).fillna(0).to_numpy()
+    high_cases = high_counts.sum()
+    low_cases = low_counts.sum()
     
     # หาค่าเฉลี่ยต่อเดือน (เพราะจำนวนเดือนที่ฝุ่นสูงกับต่ำอาจไม่เท่ากัน)
     months_high = len(df_pm25_high)
@@ -72,70 +171,17 @@ def analyze_vulnerable_impact(df, df_pm25):
         increase_pct = ((avg_high - avg_low) / avg_low) * 100
     else:
         increase_pct = 0 if avg_high == 0 else 100 # ถ้าปกติไม่มีคนป่วยเลย แต่ฝุ่นสูงมีคนป่วย ถือว่าเพิ่ม 100%
+
+    uncertainty = bootstrap_vulnerable_change(high_counts, low_counts)
         
-    return increase_pct, avg_high, avg_low
+    return increase_pct, avg_high, avg_low, uncertainty
 
 def render_smart_insights(df_filtered, df_pm25):
     """วาด UI สำหรับ Smart Insight Dashboard พร้อมระบบ Tooltip Hover สุดฉลาด"""
     if df_filtered.empty or df_pm25.empty:
         return
 
-    # --- CSS สำหรับทำ Hover Tooltip สวยๆ และบังคับฟอนต์ Sarabun + Fallback Emoji ---
-    tooltip_css = """
-    <style>
-    .smart-tooltip {
-        position: relative;
-        display: inline-block;
-        cursor: help;
-        color: #94a3b8;
-        font-size: 0.95rem;
-        margin-left: 6px;
-    }
-    .smart-tooltip .tooltip-text {
-        visibility: hidden;
-        width: 280px;
-        background-color: #1e293b;
-        color: #f8fafc;
-        text-align: left;
-        border-radius: 8px;
-        padding: 12px 14px;
-        position: absolute;
-        z-index: 1000;
-        bottom: 130%;
-        left: 50%;
-        margin-left: -140px;
-        opacity: 0;
-        transition: opacity 0.3s;
-        font-family: 'Sarabun', 'Segoe UI', 'Apple Color Emoji', 'Segoe UI Emoji', 'Segoe UI Symbol', 'Noto Color Emoji', sans-serif !important;
-        font-size: 0.8rem;
-        font-weight: 300;
-        line-height: 1.5;
-        box-shadow: 0px 8px 16px rgba(0,0,0,0.15);
-    }
-    .smart-tooltip .tooltip-text::after {
-        content: "";
-        position: absolute;
-        top: 100%;
-        left: 50%;
-        margin-left: -6px;
-        border-width: 6px;
-        border-style: solid;
-        border-color: #1e293b transparent transparent transparent;
-    }
-    .smart-tooltip:hover .tooltip-text {
-        visibility: visible;
-        opacity: 1;
-    }
-    .tooltip-title {
-        color: #38bdf8;
-        font-weight: bold;
-        display: block;
-        margin-bottom: 4px;
-        font-size: 0.85rem;
-    }
-    </style>
-    """
-    st.markdown(tooltip_css, unsafe_allow_html=True)
+    # CSS ของ Hover Tooltip (.smart-tooltip) อยู่ใน GLOBAL_CSS ของ ui_components ส่งพร้อม CSS หลักของแอป
 
     st.markdown("### 🧠 Smart Insights: วิเคราะห์ข้อมูลเชิงลึกทางสถิติ")
     
@@ -144,13 +190,15 @@ def render_smart_insights(df_filtered, df_pm25):
     merged_stats = pd.merge(monthly_cases, df_pm25, on='Month_Year', how='inner')
     
     overall_corr = np.nan
+    overall_ci = (np.nan, np.nan, np.nan)
     if len(merged_stats) > 1:
         overall_corr = merged_stats['Patient_Count'].corr(merged_stats['PM25'])
+        overall_ci = bootstrap_correlation(merged_stats['Patient_Count'].to_numpy(), merged_stats['PM25'].to_numpy())
         
     level, color, icon, desc = get_correlation_insight(overall_corr)
     
-    # 2. คำนวณ Disease Correlation
-    top_disease, top_corr = analyze_disease_correlation(df_filtered, df_pm25)
+    # 2. คำนวณ Disease Correlation (พร้อมช่วงความเชื่อมั่นของทุกโรค)
+    top_disease, top_corr, disease_stats = analyze_disease_correlation(df_filtered, df_pm25)
     
     # 3. คำนวณ Vulnerable Impact
     vul_result = analyze_vulnerable_impact(df_filtered, df_pm25)
@@ -168,17 +216,25 @@ def render_smart_insights(df_filtered, df_pm25):
                 <div class="smart-tooltip">ℹ️
                     <span class="tooltip-text">
                         <span class="tooltip-title">📊 สถิติที่ใช้: Pearson Correlation (r)</span>
-                        เหมาะสมที่สุดในการตอบคำถามว่า 'เมื่อฝุ่นเพิ่มขึ้น ผู้ป่วยเพิ่มตามหรือไม่' เป็นมาตรฐานสากลในการหาความสัมพันธ์เชิงเส้น ซึ่งตอบโจทย์สาธารณสุขได้ตรงจุดและเข้าใจง่าย
+                        เหมาะสมที่สุดในการตอบคำถามว่า 'เมื่อฝุ่นเพิ่มขึ้น ผู้ป่วยเพิ่มตามหรือไม่' เป็นมาตรฐานสากลในการหาความสัมพันธ์เชิงเส้น ซึ่งตอบโจทย์สาธารณสุขได้ตรงจุดและเข้าใจง่าย<br>
+                        ช่วงความเชื่อมั่น 95% มาจากการสุ่มซ้ำแบบ Bootstrap {N_RESAMPLES:,} รอบ และ p-value จาก Permutation Test
                     </span>
                 </div>
             </div>
             <h3 style="color: {color}; margin: 0; font-family: 'Sarabun', sans-serif;">{level} <span style="font-size: 1rem; color: #94a3b8;">(r={corr_val})</span></h3>
-            <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">{desc}</p>
+            <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">{desc}<br>
+                <span style="font-size: 0.75rem;">{format_uncertainty(*overall_ci)}</span>
+            </p>
         </div>
         """, unsafe_allow_html=True)
         
     # Card 2: โรคที่อ่อนไหวที่สุด
     with c2:
+        # รายการทุกโรคเรียงตามค่า r พร้อมช่วงความเชื่อมั่น (แสดงทั้งกรณีพบและไม่พบโรคที่สัมพันธ์ชัดเจน)
+        disease_lines = "<br>".join(
+            f"• {d}: r={r:.2f} ({format_uncertainty(lo, hi, p)})"
+            for d, (r, lo, hi, p) in sorted(disease_stats.items(), key=lambda item: item[1][0], reverse=True)
+        )
         if top_disease and top_corr >= 0.3:
             st.markdown(f"""
             <div style="background-color: #f8fafc; padding: 15px; border-radius: 10px; border-top: 4px solid #8b5cf6; height: 100%;">
@@ -187,12 +243,16 @@ def render_smart_insights(df_filtered, df_pm25):
                     <div class="smart-tooltip">ℹ️
                         <span class="tooltip-text">
                             <span class="tooltip-title">🔍 กระบวนการ: Comparative Sensitivity</span>
-                            ช่วยให้แพทย์จัดลำดับความสำคัญ (Prioritization) ได้ทันที ว่าโรคใดทำปฏิกิริยากับฝุ่นไวที่สุด เพื่อบริหารทรัพยากรเตียงและยาเตรียมรับมือได้ล่วงหน้า
+                            ช่วยให้แพทย์จัดลำดับความสำคัญ (Prioritization) ได้ทันที ว่าโรคใดทำปฏิกิริยากับฝุ่นไวที่สุด เพื่อบริหารทรัพยากรเตียงและยาเตรียมรับมือได้ล่วงหน้า<br>
+                            <span class="tooltip-title" style="margin-top: 6px;">ทุกกลุ่มโรค</span>
+                            {disease_lines}
                         </span>
                     </div>
                 </div>
                 <h4 style="color: #8b5cf6; margin: 0; font-family: 'Sarabun', sans-serif;">{top_disease}</h4>
-                <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">มีความสัมพันธ์กับฝุ่นสูงสุด (r={top_corr:.2f})</p>
+                <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">มีความสัมพันธ์กับฝุ่นสูงสุด (r={top_corr:.2f})<br>
+                    <span style="font-size: 0.75rem;">{format_uncertainty(*disease_stats[top_disease][1:])}</span>
+                </p>
             </div>
             """, unsafe_allow_html=True)
         else:
@@ -200,13 +260,15 @@ def render_smart_insights(df_filtered, df_pm25):
             <div style="background-color: #f8fafc; padding: 15px; border-radius: 10px; border-top: 4px solid #cbd5e1; height: 100%;">
                 <h5 style="color: #475569; margin-bottom: 5px; font-family: 'Sarabun', sans-serif;">โรคที่อ่อนไหวต่อฝุ่นที่สุด 💨</h5>
                 <p style="font-size: 0.9rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">ยังไม่พบกลุ่มโรคที่มีความสัมพันธ์กับฝุ่นอย่างชัดเจน</p>
+                <p style="font-size: 0.75rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">{disease_lines}</p>
             </div>
             """, unsafe_allow_html=True)
 
     # Card 3: ผลกระทบต่อกลุ่มเปราะบาง
     with c3:
         if vul_result:
-            increase_pct, avg_high, avg_low = vul_result
+            increase_pct, avg_high, avg_low, vul_ci = vul_result
+            vul_ci_text = format_uncertainty(*vul_ci, value_format="{:+.1f}%")
             if increase_pct > 0:
                 st.markdown(f"""
                 <div style="background-color: #fef2f2; padding: 15px; border-radius: 10px; border-top: 4px solid #ef4444; height: 100%;">
@@ -215,14 +277,16 @@ def render_smart_insights(df_filtered, df_pm25):
                         <div class="smart-tooltip">ℹ️
                             <span class="tooltip-text">
                                 <span class="tooltip-title">📈 สถิติที่ใช้: Percentage Change</span>
-                                การใช้ 'ร้อยละการเปลี่ยนแปลง' เหมาะสมต่อการนำเสนอผู้บริหาร เพราะสะท้อน 'ขนาดภาระงานที่เพิ่มขึ้นจริง' (Magnitude) ออกมาเป็นตัวเลขที่จับต้องได้ สื่อสารได้ทรงพลังกว่าค่า P-Value
+                                การใช้ 'ร้อยละการเปลี่ยนแปลง' เหมาะสมต่อการนำเสนอผู้บริหาร เพราะสะท้อน 'ขนาดภาระงานที่เพิ่มขึ้นจริง' (Magnitude) ออกมาเป็นตัวเลขที่จับต้องได้ สื่อสารได้ทรงพลังกว่าค่า P-Value<br>
+                                ช่วงความเชื่อมั่น 95% ได้จาก Bootstrap รายเดือน และ p-value จากการสลับป้ายเดือนฝุ่นสูง/ปกติ (Permutation Test)
                             </span>
                         </div>
                     </div>
                     <h3 style="color: #ef4444; margin: 0; font-family: 'Sarabun', sans-serif;">+{increase_pct:.1f}%</h3>
                     <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">
                         ผู้ป่วยเด็ก/ผู้สูงอายุ/คนท้อง <b>เพิ่มขึ้น</b> ในเดือนที่ฝุ่นเกินมาตรฐาน (>37.5 µg/m³) <br>
-                        <span style="font-size: 0.75rem;">(เฉลี่ย {avg_high:.0f} คน/เดือน เทียบกับปกติ {avg_low:.0f} คน)</span>
+                        <span style="font-size: 0.75rem;">(เฉลี่ย {avg_high:.0f} คน/เดือน เทียบกับปกติ {avg_low:.0f} คน)</span><br>
+                        <span style="font-size: 0.75rem;">{vul_ci_text}</span>
                     </p>
                 </div>
                 """, unsafe_allow_html=True)
@@ -231,7 +295,9 @@ def render_smart_insights(df_filtered, df_pm25):
                 <div style="background-color: #f0fdf4; padding: 15px; border-radius: 10px; border-top: 4px solid #22c55e; height: 100%;">
                     <h5 style="color: #475569; margin-bottom: 5px; font-family: 'Sarabun', sans-serif;">ภัยคุกคามกลุ่มเปราะบาง 🛡️</h5>
                     <h3 style="color: #22c55e; margin: 0; font-family: 'Sarabun', sans-serif;">ทรงตัว</h3>
-                    <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">ไม่พบการเพิ่มขึ้นของกลุ่มเปราะบางในเดือนที่ฝุ่นเกินมาตรฐาน</p>
+                    <p style="font-size: 0.85rem; color: #64748b; margin-top: 5px; font-family: 'Sarabun', sans-serif;">ไม่พบการเพิ่มขึ้นของกลุ่มเปราะบางในเดือนที่ฝุ่นเกินมาตรฐาน<br>
+                        <span style="font-size: 0.75rem;">(เปลี่ยนแปลง {increase_pct:+.1f}%, {vul_ci_text})</span>
+                    </p>
                 </div>
                 """, unsafe_allow_html=True)
         else:
@@ -1,12 +1,145 @@
 import streamlit as st
-import plotly.express as px
+from pathlib import Path
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from data_validator import QUARANTINE_REASON_COLUMN
+
+# หมายเหตุ: plotly.express ถูก import แบบ lazy ภายในฟังก์ชันวาดกราฟ
+# (plotly และ graph_objects ถูกโหลดโดย streamlit อยู่แล้ว มีเพียง plotly.express ที่เป็นต้นทุนเพิ่ม)
+
+# ไอคอนเมฆและลมของ Sidebar แบบ inline SVG (ไม่ต้องดึงรูปจาก CDN ภายนอก)
+SIDEBAR_ICON_SVG = """
+<svg xmlns="http://www.w3.org/2000/svg" width="65" height="65" viewBox="0 0 64 64" fill="none">
+    <path d="M18 36a10 10 0 0 1 1.6-19.9A14 14 0 0 1 46 20a9 9 0 0 1 0 18H18z" fill="#cfe8fc" stroke="#3b82f6" stroke-width="2.5" stroke-linejoin="round"/>
+    <path d="M8 45h30a5 5 0 1 0-5-5" stroke="#64748b" stroke-width="2.5" stroke-linecap="round"/>
+    <path d="M14 53h34a5 5 0 1 1-5 5" stroke="#64748b" stroke-width="2.5" stroke-linecap="round"/>
+</svg>
+"""
+
+# ไฟล์ฟอนต์ Sarabun (OFL) ที่เสิร์ฟจากเครื่องเองผ่าน Static Serving ของ Streamlit (/app/static/fonts)
+# ดาวน์โหลดเข้าโฟลเดอร์นี้ด้วย scripts/fetch_fonts.py แล้ว commit พร้อมโค้ด
+FONT_DIR = Path(__file__).parent / "static" / "fonts"
+SARABUN_WEIGHTS = {300: "Light", 400: "Regular", 500: "Medium", 700: "Bold"}
+
+def _build_font_css():
+    """@font-face จากไฟล์ใน static/fonts ถ้ามีครบทุกน้ำหนัก ไม่เช่นนั้นใช้ Google Fonts เพื่อไม่ให้ฟอนต์หายก่อนติดตั้งไฟล์"""
+    files = {w: FONT_DIR / f"Sarabun-{name}.ttf" for w, name in SARABUN_WEIGHTS.items()}
+    if not all(f.exists() for f in files.values()):
+        return "@import url('https://fonts.googleapis.com/css2?family=Sarabun:wght@300;400;500;700&display=swap');"
+    return "\n".join(
+        f"@font-face {{ font-family: 'Sarabun'; font-style: normal; font-weight: {w}; font-display: swap; "
+        f"src: local('Sarabun {SARABUN_WEIGHTS[w]}'), url('app/static/fonts/{f.name}') format('truetype'); }}"
+        for w, f in files.items()
+    )
+
+# CSS ทั้งหมดของแอป (รวม Tooltip ของ Smart Insights) ในบล็อกเดียว
+# หมายเหตุ: Streamlit ล้างหน้าทุกครั้งที่ rerun จึงยังต้องส่งบล็อกนี้ทุกรอบ ส่วนที่ลดได้คือรวมเหลือการส่งครั้งเดียวต่อรอบ
+GLOBAL_CSS = """
+    <style>
+    /* 1. ฟอนต์ Sarabun */
+    {font_css}
+    
+    /* 2. วิธีแก้แบบตรงจุด: 
+       - กำหนดฟอนต์ Sarabun ให้กับ Element ที่เป็นข้อความหลักทั้งหมด
+       - ใช้ Fallback เป็นฟอนต์ระบบมาตรฐาน เพื่อให้สัญลักษณ์ (Icons/Emojis) แสดงผลได้ปกติ
+    */
+    html, body, [data-testid="stAppViewContainer"], .stApp, p, h1, h2, h3, h4, h5, h6, label, li, span {
+        font-family: 'Sarabun', "Source Sans Pro", "Segoe UI", "Apple Color Emoji", "Segoe UI Emoji", sans-serif !important;
+    }
+
+    /* 3. วิธีแก้เฉพาะจุดสำหรับปุ่มย่อ-ขยาย Sidebar และ Header:
+       - บังคับให้ปุ่มควบคุม (Icons) กลับไปใช้ฟอนต์ดั้งเดิมของ Streamlit 100% 
+       - เพื่อป้องกันไม่ให้ Sarabun ไปทับรหัสสัญลักษณ์ของปุ่มเหล่านั้น
+    */
+    [data-testid="collapsedControl"] button, 
+    [data-testid="collapsedControl"] svg, 
+    [data-testid="stHeader"] svg,
+    button[kind="header"] {
+        font-family: "Source Sans Pro", sans-serif !important;
+    }
+
+    /* 4. ตกแต่งกล่อง Metric (คงเดิมตามความต้องการที่ไม่ให้แก้ส่วนไม่เกี่ยวข้อง) */
+    div[data-testid="metric-container"] {
+        background-color: #ffffff;
+        border: 1px solid #f0f2f6;
+        padding: 20px;
+        border-radius: 12px;
+        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03);
+    }
+    div[data-testid="metric-container"] > div > div > div > div > p {
+        font-size: 1rem;
+        color: #64748b;
+        font-weight: 500;
+    }
+    div[data-testid="metric-container"] > div > div > div > div:nth-child(2) > p {
+        font-size: 2rem;
+        color: #0f172a;
+        font-weight: 700;
+    }
+
+    /* 5. Hover Tooltip ของ Smart Insights */
+    .smart-tooltip {
+        position: relative;
+        display: inline-block;
+        cursor: help;
+        color: #94a3b8;
+        font-size: 0.95rem;
+        margin-left: 6px;
+    }
+    .smart-tooltip .tooltip-text {
+        visibility: hidden;
+        width: 280px;
+        background-color: #1e293b;
+        color: #f8fafc;
+        text-align: left;
+        border-radius: 8px;
+        padding: 12px 14px;
+        position: absolute;
+        z-index: 1000;
+        bottom: 130%;
+        left: 50%;
+        margin-left: -140px;
+        opacity: 0;
+        transition: opacity 0.3s;
+        font-family: 'Sarabun', 'Segoe UI', 'Apple Color Emoji', 'Segoe UI Emoji', 'Segoe UI Symbol', 'Noto Color Emoji', sans-serif !important;
+        font-size: 0.8rem;
+        font-weight: 300;
+        line-height: 1.5;
+        box-shadow: 0px 8px 16px rgba(0,0,0,0.15);
+    }
+    .smart-tooltip .tooltip-text::after {
+        content: "";
+        position: absolute;
+        top: 100%;
+        left: 50%;
+        margin-left: -6px;
+        border-width: 6px;
+        border-style: solid;
+        border-color: #1e293b transparent transparent transparent;
+    }
+    .smart-tooltip:hover .tooltip-text {
+        visibility: visible;
+        opacity: 1;
+    }
+    .tooltip-title {
+        color: #38bdf8;
+        font-weight: bold;
+        display: block;
+        margin-bottom: 4px;
+        font-size: 0.85rem;
+    }
+    </style>
+""".replace("{font_css}", _build_font_css())
+
+def inject_global_styles():
+    """ใส่ CSS ทั้งหมดของแอป (เรียกหนึ่งครั้งต่อการ rerun)"""
+    st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
+
 def create_sidebar_filters(df_patients):
     """สร้างเมนูด้านข้างสำหรับกรองข้อมูล (เวอร์ชันปรับปรุง UI ให้ใช้งานง่ายขึ้น)"""
-    # เปลี่ยน URL ของรูปภาพเป็นไอคอนรูปเมฆและลม
-    st.sidebar.image("https://cdn-icons-png.flaticon.com/512/1163/1163661.png", width=65) 
+    # ไอคอนรูปเมฆและลม (inline SVG ไม่ต้องโหลดจาก CDN)
+    st.sidebar.markdown(SIDEBAR_ICON_SVG, unsafe_allow_html=True)
     st.sidebar.header("⚙️ ตัวกรองข้อมูล")
     
     # 1. กรองปี (Selectbox)
@@ -142,6 +275,8 @@ def plot_demographics(df_filtered):
         st.info("📌 ไม่มีข้อมูลประชากรศาสตร์ตรงตามเงื่อนไข")
         return
 
+    import plotly.express as px
+
     # --- ส่วนที่ 1: กราฟสัดส่วนโรค ---
     disease_counts = df_filtered['4 กลุ่มโรคเฝ้าระวัง'].value_counts().reset_index()
     disease_counts.columns = ['Disease', 'Count']
@@ -231,6 +366,8 @@ def plot_geographic(df_filtered):
     geo_data.columns = ['Sub-district', 'Count']
     
     if not geo_data.empty:
+        import plotly.express as px
+
         fig = px.bar(
             geo_data, 
             y='Sub-district', 
@@ -253,3 +390,38 @@ def plot_geographic(df_filtered):
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("ไม่พบข้อมูลระดับตำบล")
+
+def render_data_quality(quality_report):
+    """
+    แสดงสรุปคุณภาพข้อมูลจากขั้นตรวจสอบ และจำนวนแถวที่ถูกคัดออก (Quarantine) แยกตามเหตุผล
+    แถวข้อมูลผู้ป่วยรายบุคคลไม่แสดงบน Dashboard (เก็บไว้ใน quality_report สำหรับตรวจสอบภายหลัง)
+    """
+    if not quality_report:
+        return
+
+    summaries = quality_report['summaries']
+    for summary in summaries:
+        for warning in summary['warnings']:
+            st.warning(f"⚠️ {summary['name']}: {warning}")
+
+    with st.expander("🧪 คุณภาพข้อมูล"):
+        cols = st.columns(len(summaries))
+        for col, summary in zip(cols, summaries):
+            with col:
+                st.markdown(f"**{summary['name']}**")
+                st.markdown(
+                    f"- ใช้งานได้ {summary['clean_rows']:,} จาก {summary['total_rows']:,} แถว\n"
+                    f"- แปลงวันที่ไม่ได้ {summary['date_failures']:,} แถว ({summary['date_failure_rate']:.1%})\n"
+                    f"- ข้อมูลซ้ำ {summary['duplicates']:,} แถว"
+                    + ("" if summary['duplicates_removed'] else " (ซ้ำทุกคอลัมน์ ไม่ได้คัดออก)")
+                    + (f"\n- แถวว่าง (ข้าม) {summary['blank_rows']:,} แถว" if 'blank_rows' in summary else "")
+                )
+
+                quarantine = quality_report['quarantine'][summary['name']]
+                if not quarantine.empty:
+                    reason_counts = quarantine[QUARANTINE_REASON_COLUMN].value_counts()
+                    st.markdown("**แถวที่ถูกคัดออก**\n" + "\n".join(
+                        f"- {reason}: {count:,} แถว" for reason, count in reason_counts.items()
+                    ))
+                    if summary['publish_quarantine_rows']:
+                        st.dataframe(quarantine, use_container_width=True)